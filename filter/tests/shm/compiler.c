@@ -131,9 +131,26 @@ main(int argc, char **argv) {
 		return 1;
 	}
 
+	// Hint the kernel to back the region with transparent huge pages to
+	// reduce TLB pressure; this is advisory, so failure is not fatal.
+	if (madvise(memory, size, MADV_HUGEPAGE) != 0) {
+		LOG(WARN, "madvise(MADV_HUGEPAGE) failed: %s", strerror(errno));
+	}
+
+#ifdef MADV_POPULATE_WRITE
+	// Prefault the mapping (after the huge page hint so it is honored) to
+	// avoid per-page faults while building the filter; optional as well.
+	if (madvise(memory, size, MADV_POPULATE_WRITE) != 0) {
+		LOG(WARN,
+		    "madvise(MADV_POPULATE_WRITE) failed: %s",
+		    strerror(errno));
+	}
+#endif
+
 	// Init common in the beginning of the shared memory
 	struct common *common = (struct common *)memory;
-	atomic_init(&common->ready, 0);
+	// The filter may already be polling the flag, so use an atomic store
+	atomic_store(&common->ready, 0);
 	memset(&common->filter, 0, sizeof(struct filter));
 
 	struct block_allocator alloc;
@@ -138,6 +138,12 @@ main(int argc, char **argv) {
 		return 1;
 	}
 
+	// Hint the kernel to back the region with transparent huge pages to
+	// reduce TLB pressure; this is advisory, so failure is not fatal.
+	if (madvise(memory, size, MADV_HUGEPAGE) != 0) {
+		LOG(WARN, "madvise(MADV_HUGEPAGE) failed: %s", strerror(errno));
+	}
+
 	// Get pointer to common
 	struct common *common = (struct common *)memory;
 
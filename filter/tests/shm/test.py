@@ -24,25 +24,37 @@ def main():
     rc1 = rc2 = 0
     try:
         print(f"Allocated shared memory: name={shm.name} size={size}")
+        # The filter polls the `ready` flag set by the compiler, so both
+        # can be started at once and the filter startup overlaps compilation.
         print(f"Running compiler: {compiler_path}")
-        p1 = subprocess.run([compiler_path, shm.name, str(size)], check=False)
-        rc1 = p1.returncode
+        p1 = subprocess.Popen([compiler_path, shm.name, str(size)])
+        print(f"Running filter: {filter_path}")
+        try:
+            p2 = subprocess.Popen([filter_path, shm.name, str(size)])
+        except Exception:
+            p1.kill()
+            p1.wait()
+            print(f"Failed to start filter")
+            raise
+
+        rc1 = p1.wait()
         print(f"Compiler exited with code {rc1}")
         if rc1 != 0:
+            p2.kill()
+            p2.wait()
             print(f"Failed to compile filter")
             raise Exception("Failed to compile filter")
 
-        print(f"Running filter: {filter_path}")
-        p2 = subprocess.run([filter_path, shm.name, str(size)], check=False)
-        rc2 = p2.returncode
+        rc2 = p2.wait()
         print(f"Filter exited with code {rc2}")
         if rc2 != 0:
             print(f"Failed to filter packets")
             raise Exception("Failed to filter packets")
     except Exception:
-        shm.unlink()
         exit(1)
-    shm.unlink()
+    finally:
+        shm.close()
+        shm.unlink()
     
     print('OK')
     
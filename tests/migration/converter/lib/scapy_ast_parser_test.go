@@ -0,0 +1,96 @@
+package lib
+
+import (
+	"encoding/json"
+	"os"
+	"os/exec"
+	"path/filepath"
+	"testing"
+
+	"github.com/stretchr/testify/require"
+)
+
+// parseGenPySource runs scapy_ast_parser.py on the given gen.py source and
+// returns the decoded IR.
+func parseGenPySource(t *testing.T, source string) IRJSON {
+	t.Helper()
+
+	genPyPath := filepath.Join(t.TempDir(), "gen.py")
+	require.NoError(t, os.WriteFile(genPyPath, []byte(source), 0644))
+
+	output, err := exec.Command("python3", "../scapy_ast_parser.py", genPyPath).Output()
+	require.NoError(t, err, "Python parser failed")
+
+	var ir IRJSON
+	require.NoError(t, json.Unmarshal(output, &ir), "invalid IR JSON: %s", string(output))
+	return ir
+}
+
+// ipDsts returns the IP dst of every packet, in order.
+func ipDsts(packets []IRPacketDef) []interface{} {
+	var dsts []interface{}
+	for _, pkt := range packets {
+		for _, layer := range pkt.Layers {
+			if layer.Type == "IP" {
+				dsts = append(dsts, layer.Params["dst"])
+			}
+		}
+	}
+	return dsts
+}
+
+func TestScapyASTParser_HelperSeesReassignedVariable(t *testing.T) {
+	ir := parseGenPySource(t, `
+addr = "10.0.0.1"
+
+def pkt_addr():
+    return Ether()/IP(dst=addr)
+
+write_pcap("003-send.pcap", pkt_addr())
+addr = "10.0.0.2"
+write_pcap("003-expect.pcap", pkt_addr())
+`)
+
+	require.Len(t, ir.PCAPPairs, 1)
+	require.Equal(t, []interface{}{"10.0.0.1"}, ipDsts(ir.PCAPPairs[0].SendPackets))
+	require.Equal(t, []interface{}{"10.0.0.2"}, ipDsts(ir.PCAPPairs[0].ExpectPackets))
+}
+
+func TestScapyASTParser_HelperRedefinition(t *testing.T) {
+	ir := parseGenPySource(t, `
+def pkt():
+    return Ether()/IP(dst="1.1.1.1")
+
+write_pcap("004-send.pcap", pkt())
+
+def pkt():
+    return Ether()/IP(dst="2.2.2.2")
+
+write_pcap("004-expect.pcap", pkt())
+`)
+
+	require.Len(t, ir.PCAPPairs, 1)
+	require.Equal(t, []interface{}{"1.1.1.1"}, ipDsts(ir.PCAPPairs[0].SendPackets))
+	require.Equal(t, []interface{}{"2.2.2.2"}, ipDsts(ir.PCAPPairs[0].ExpectPackets))
+}
+
+func TestScapyASTParser_NestedHelperRedefinition(t *testing.T) {
+	ir := parseGenPySource(t, `
+def inner():
+    return IP(dst="1.1.1.1")
+
+def outer():
+    return Ether()/inner
+
+write_pcap("005-send.pcap", outer())
+
+def inner():
+    return IP(dst="2.2.2.2")
+
+write_pcap("005-expect.pcap", outer())
+`)
+
+	require.Len(t, ir.PCAPPairs, 1)
+	require.Equal(t, []interface{}{"1.1.1.1"}, ipDsts(ir.PCAPPairs[0].SendPackets))
+	require.Equal(t, []interface{}{"2.2.2.2"}, ipDsts(ir.PCAPPairs[0].ExpectPackets))
+}
@@ -3,49 +3,120 @@
 """
 Scapy AST Parser - Parses gen.py files using Python AST to extract packet definitions.
 Outputs structured JSON IR for Go code generation.
+
+JSON is encoded with orjson when it is installed and with the stdlib json
+module otherwise. Both describe the same IR, but the text differs: orjson
+writes non-ASCII characters as raw UTF-8 instead of \\u escapes, spells
+some floats differently (1e20 vs 1e+20) and encodes non-finite floats as
+null where json writes the non-standard Infinity/NaN.
 """
 
 import ast
+import hashlib
 import json
+import os
+import re
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
 from typing import Any, Dict, List, Optional, Union
 
+try:
+    import orjson
+except ImportError:  # optional, the stdlib encoder is used instead
+    orjson = None
+
+# Environment variable naming a directory for caching encoded IR; the cache
+# is disabled when it is unset
+_CACHE_DIR_ENV = 'YANET2_SCAPY_AST_CACHE_DIR'
+
+# Scapy constructors that start a single-layer packet
+_SCAPY_LAYERS = frozenset({
+    'Ether', 'IP', 'IPv6', 'TCP', 'UDP', 'ICMP', 'ICMPv6EchoRequest',
+    'ICMPv6EchoReply', 'ICMPv6DestUnreach', 'Raw', 'Dot1Q', 'GRE', 'MPLS',
+})
+# Scapy functions returning a list of fragments
+_FRAG_FNS = frozenset({'fragment', 'fragment6'})
+# Keyword names accepted for the fragment size
+_FRAGSIZE_KWS = frozenset({'fragSize', 'fragsize'})
+
+# Layer keywords whose string values may use CIDR notation
+_ADDR_KEYS = frozenset({'src', 'dst'})
+
+# "<base>-send", "<base>_expect", ... PCAP file stems
+_PAIR_SUFFIX_RE = re.compile(r'(.*)[-_](?:send|expect)$')
+
+# Marks nodes that ast.literal_eval cannot evaluate in the _eval_node cache
+_NOT_LITERAL = object()
 
+# Fields that can hold write_pcap statements; generic_visit descends only into
+# these, skipping expression subtrees (packet BinOp chains, literals, etc.).
+# Statement types missing here fall back to visiting all of their children.
+_STMT_FIELDS = {
+    ast.Module: ('body',),
+    ast.ClassDef: ('body',),
+    ast.If: ('body', 'orelse'),
+    ast.For: ('body', 'orelse'),
+    ast.AsyncFor: ('body', 'orelse'),
+    ast.While: ('body', 'orelse'),
+    ast.With: ('body',),
+    ast.AsyncWith: ('body',),
+    ast.Try: ('body', 'handlers', 'orelse', 'finalbody'),
+    ast.ExceptHandler: ('body',),
+    ast.Match: ('cases',),
+    ast.match_case: ('body',),
+    ast.Expr: ('value',),
+}
+if hasattr(ast, 'TryStar'):  # Python 3.11+
+    _STMT_FIELDS[ast.TryStar] = ('body', 'handlers', 'orelse', 'finalbody')
+
+
+@dataclass(slots=True)
 class PacketLayer:
     """Represents a single layer in a packet (e.g., Ether, IP, TCP)"""
-    def __init__(self, layer_type: str, params: Dict[str, Any]):
-        self.layer_type = layer_type
-        self.params = params
+    layer_type: str
+    params: Dict[str, Any]
     
     def to_dict(self):
         return {
             "type": self.layer_type,
             "params": self.params
         }
+    
+    def _json_view(self):
+        """Shallow view for _IREncoder; nested IR objects are left in place"""
+        return self.to_dict()
 
 
+@dataclass(slots=True)
 class PacketDefinition:
     """Represents a complete packet definition"""
-    def __init__(self, layers: List[PacketLayer], special_handling: Optional[Dict] = None):
-        self.layers = layers
-        self.special_handling = special_handling
+    layers: List[PacketLayer]
+    special_handling: Optional[Dict] = None
     
     def to_dict(self):
         return {
             "layers": [layer.to_dict() for layer in self.layers],
             "special_handling": self.special_handling
         }
+    
+    def _json_view(self):
+        """Shallow view for _IREncoder; nested IR objects are left in place"""
+        return {
+            "layers": self.layers,
+            "special_handling": self.special_handling
+        }
 
 
+@dataclass(slots=True)
 class PCAPPair:
     """Represents a send/expect PCAP file pair"""
-    def __init__(self, send_file: str, expect_file: str, 
-                 send_packets: List[PacketDefinition], 
-                 expect_packets: List[PacketDefinition]):
-        self.send_file = send_file
-        self.expect_file = expect_file
-        self.send_packets = send_packets
-        self.expect_packets = expect_packets
+    send_file: str
+    expect_file: str
+    send_packets: List[PacketDefinition]
+    expect_packets: List[PacketDefinition]
     
     def to_dict(self):
         return {
@@ -54,34 +125,168 @@ class PCAPPair:
             "send_packets": [pkt.to_dict() for pkt in self.send_packets],
             "expect_packets": [pkt.to_dict() for pkt in self.expect_packets]
         }
+    
+    def _json_view(self):
+        """Shallow view for _IREncoder; nested IR objects are left in place"""
+        return {
+            "send_file": self.send_file,
+            "expect_file": self.expect_file,
+            "send_packets": self.send_packets,
+            "expect_packets": self.expect_packets
+        }
+
+
+def _ir_default(o):
+    """Expand IR objects for JSON encoding (shared by json and orjson)"""
+    if isinstance(o, (PacketLayer, PacketDefinition, PCAPPair)):
+        return o._json_view()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class _IREncoder(json.JSONEncoder):
+    """JSON encoder that serializes IR objects while walking the tree once"""
+    def default(self, o):
+        return _ir_default(o)
+
+
+def _encode_ir(ir: Dict) -> bytes:
+    """Encode IR as indented JSON, using orjson when available (see module docs)"""
+    if orjson is not None:
+        try:
+            # Dataclasses must go through _ir_default to keep the IR field names
+            out = orjson.dumps(
+                ir,
+                default=_ir_default,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATACLASS
+            )
+        except TypeError:
+            # e.g. integers wider than 64 bits, which only the stdlib handles
+            out = None
+        if out is not None:
+            return out + b"\n"
+    
+    # Encode fully before anything is written, so that an unencodable value
+    # does not leave a truncated document on stdout
+    return (json.dumps(ir, indent=2, cls=_IREncoder) + "\n").encode()
 
 
 class ScapyASTParser(ast.NodeVisitor):
     """AST visitor that extracts Scapy packet definitions from gen.py files"""
     
-    def __init__(self, verbose: bool = False):
+    def __init__(self, verbose: bool = False, cache_dir: Optional[str] = None):
         self.verbose = verbose
+        # Verbose runs must walk the tree to print diagnostics, so skip the cache
+        self.cache_dir = None if verbose else cache_dir
         self.write_pcap_calls: List[Dict] = []
         self.helper_functions: Dict[str, ast.FunctionDef] = {}
         self.current_function: Optional[str] = None
         self.variables: Dict[str, Any] = {}  # Store variable assignments
+        self._helper_cache: Dict[str, List[PacketDefinition]] = {}
+        self._eval_cache: Dict[int, Any] = {}  # id(node) -> literal value or _NOT_LITERAL
+        # Returned expression of each helper, located at definition time
+        self._helper_returns: Dict[str, Optional[ast.expr]] = {}
+        # write_pcap call located inside each write_pcap_* helper at definition time
+        self._helper_write_pcap_calls: Dict[str, Optional[ast.Call]] = {}
+        # Node type -> handler table, avoids NodeVisitor's per-node getattr dispatch
+        self._handlers = {
+            ast.FunctionDef: self.visit_FunctionDef,
+            ast.Assign: self.visit_Assign,
+            ast.Call: self.visit_Call,
+        }
+    
+    def visit(self, node: ast.AST):
+        """Dispatch node to its handler or fall back to generic_visit"""
+        handler = self._handlers.get(type(node))
+        if handler is not None:
+            return handler(node)
+        return self.generic_visit(node)
+    
+    def generic_visit(self, node: ast.AST):
+        """Visit statement-bearing children of node (see _STMT_FIELDS)"""
+        fields = _STMT_FIELDS.get(type(node))
+        if fields is None:
+            if isinstance(node, ast.stmt):
+                for child in ast.iter_child_nodes(node):
+                    self.visit(child)
+            return
+        for field in fields:
+            value = getattr(node, field)
+            if isinstance(value, list):
+                for child in value:
+                    self.visit(child)
+            else:
+                self.visit(value)
     
     def parse_file(self, filepath: str) -> Dict:
-        """Parse a gen.py file and return structured IR"""
+        """Parse a gen.py file and return structured IR as plain JSON data"""
+        return json.loads(self.parse_file_json(filepath))
+    
+    def parse_file_json(self, filepath: str) -> bytes:
+        """Parse a gen.py file and return its IR encoded as JSON"""
         with open(filepath, 'r', encoding='utf-8') as f:
             content = f.read()
         
+        cache_path = self._cache_path(content) if self.cache_dir else None
+        if cache_path:
+            data = self._load_cached(cache_path)
+            if data is not None:
+                return data
+        
+        data = _encode_ir(self._parse_source(content, filepath))
+        if cache_path:
+            self._store_cached(cache_path, data)
+        return data
+    
+    def _parse_source(self, content: str, filepath: str) -> Dict:
+        """Parse gen.py source into IR objects"""
         tree = ast.parse(content, filename=filepath)
+        # Cache is keyed by node id, which is only stable while the tree is alive
+        self._eval_cache.clear()
         self.visit(tree)
         
         # Process write_pcap calls and build PCAP pairs
         pcap_pairs = self._build_pcap_pairs()
         
         return {
-            "pcap_pairs": [pair.to_dict() for pair in pcap_pairs],
+            "pcap_pairs": pcap_pairs,
             "helper_functions": list(self.helper_functions.keys())
         }
     
+    def _cache_path(self, content: str) -> str:
+        """Get the cache file path for the given gen.py content"""
+        h = hashlib.sha256(sys.version.encode())
+        # Include the parser itself so that changes to extraction invalidate the
+        # cache, and the encoder since orjson and json output differ
+        with open(__file__, 'rb') as f:
+            h.update(f.read())
+        h.update(b'orjson' if orjson is not None else b'json')
+        h.update(content.encode())
+        return os.path.join(self.cache_dir, h.hexdigest() + '.json')
+    
+    def _load_cached(self, path: str) -> Optional[bytes]:
+        """Load cached encoded IR, returns None on miss or unreadable entry"""
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    def _store_cached(self, path: str, data: bytes):
+        """Atomically store encoded IR in the cache; failures are not fatal"""
+        tmp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=self.cache_dir, delete=False) as f:
+                tmp_path = f.name
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            if tmp_path:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+    
     def visit_FunctionDef(self, node: ast.FunctionDef):
         """Visit function definitions to extract helper functions"""
         # Skip write_pcap definition itself (it's the main function)
@@ -91,6 +296,16 @@ class ScapyASTParser(ast.NodeVisitor):
         # Store ALL other functions as potential helper functions
         # This includes ipv4_packet1(), ipv6_packet1(), etc.
         self.helper_functions[node.name] = node
+        self._helper_returns[node.name] = next(
+            (stmt.value for stmt in node.body if isinstance(stmt, ast.Return) and stmt.value),
+            None
+        )
+        # Helpers may refer to other helpers and variables defined later in the
+        # file, so expansion itself is deferred to the first use. Other helpers
+        # may have expanded the previous definition, so drop all expansions.
+        self._helper_cache.clear()
+        if node.name.startswith('write_pcap'):
+            self._helper_write_pcap_calls[node.name] = self._find_write_pcap_call(node)
         if self.verbose:
             print(f"Found helper function: {node.name}")
 
@@ -105,10 +320,12 @@ class ScapyASTParser(ast.NodeVisitor):
                 var_name = target.id
                 # Store the AST node for later resolution
                 self.variables[var_name] = node.value
+                # Helper expansions resolve variables at call time
+                self._helper_cache.clear()
                 if self.verbose:
                     print(f"Found variable assignment: {var_name}")
         
-        self.generic_visit(node)
+        # write_pcap is only ever a statement, so the value is not visited
     
     def visit_Call(self, node: ast.Call):
         """Visit function calls to extract write_pcap calls"""
@@ -130,7 +347,8 @@ class ScapyASTParser(ast.NodeVisitor):
                 if self.verbose:
                     print(f"Found helper write_pcap call: {func_name}")
         
-        self.generic_visit(node)
+        # Arguments are not visited: packet expressions are walked by
+        # _extract_packet and cannot contain write_pcap statements
     
     def _extract_write_pcap_call(self, node: ast.Call) -> Optional[Dict]:
         """Extract filename and packet definitions from write_pcap call"""
@@ -157,9 +375,8 @@ class ScapyASTParser(ast.NodeVisitor):
     def _extract_helper_write_pcap_call(self, node: ast.Call) -> Optional[Dict]:
         """Extract write_pcap call from helper function like write_pcap_step1"""
         func_name = self._get_call_name(node)
-        helper_func = self.helper_functions.get(func_name)
         
-        if not helper_func or not node.args:
+        if func_name not in self.helper_functions or not node.args:
             return None
         
         # First argument should be filename
@@ -168,51 +385,60 @@ class ScapyASTParser(ast.NodeVisitor):
         if not isinstance(filename, str):
             return None
         
-        # Find the write_pcap call inside the helper function
-        # and extract packets from it, substituting the filename parameter
-        for stmt in ast.walk(helper_func):
-            if isinstance(stmt, ast.Call) and isinstance(stmt.func, ast.Name) and stmt.func.id == 'write_pcap':
-                # Extract packets from this call
-                packets = []
-                for packet_node in stmt.args[1:]:  # Skip filename argument
-                    packet_defs = self._extract_packet(packet_node)
-                    packets.extend(packet_defs)
-                
-                return {
-                    "filename": filename,
-                    "packets": packets
-                }
+        # Extract packets from the write_pcap call inside the helper function,
+        # substituting the filename parameter
+        stmt = self._helper_write_pcap_calls.get(func_name)
+        if stmt is None:
+            return None
+        
+        packets = []
+        for packet_node in stmt.args[1:]:  # Skip filename argument
+            packet_defs = self._extract_packet(packet_node)
+            packets.extend(packet_defs)
         
+        return {
+            "filename": filename,
+            "packets": packets
+        }
+    
+    def _find_write_pcap_call(self, func: ast.FunctionDef) -> Optional[ast.Call]:
+        """Find the first write_pcap call inside a helper function body"""
+        # Depth-first in source order, stopping at the first match
+        stack = list(reversed(func.body))
+        while stack:
+            stmt = stack.pop()
+            if isinstance(stmt, ast.Call) and isinstance(stmt.func, ast.Name) and stmt.func.id == 'write_pcap':
+                return stmt
+            stack.extend(reversed(list(ast.iter_child_nodes(stmt))))
         return None
     
     def _extract_packet(self, node: ast.AST) -> List[PacketDefinition]:
         """Extract packet definition(s) from an AST node"""
         # Handle different packet construction patterns
-        
-        # 1. Direct layer chain: Ether()/IP()/TCP()
-        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Div):
-            return [self._parse_layer_chain(node)]
-        
-        # 2. Function call that returns packet(s)
-        if isinstance(node, ast.Call):
-            func_name = self._get_call_name(node)
+        match node:
+            # 1. Direct layer chain: Ether()/IP()/TCP()
+            case ast.BinOp(op=ast.Div()):
+                return [self._parse_layer_chain(node)]
             
-            # fragment() or fragment6() - returns list of packets
-            if func_name in ['fragment', 'fragment6']:
-                return self._handle_fragmentation(node)
-            
-            # Helper function call
-            if func_name in self.helper_functions:
-                return self._handle_helper_function(node)
+            # 2. Function call that returns packet(s)
+            case ast.Call():
+                func_name = self._get_call_name(node)
+                
+                # fragment() or fragment6() - returns list of packets
+                if func_name in _FRAG_FNS:
+                    return self._handle_fragmentation(node)
+                
+                # Helper function call
+                if func_name in self.helper_functions:
+                    return self._handle_helper_function(node)
+                
+                # Single layer (starting point)
+                if func_name in _SCAPY_LAYERS:
+                    return [self._parse_single_layer_packet(node)]
             
-            # Single layer (starting point)
-            if func_name in ['Ether', 'IP', 'IPv6', 'TCP', 'UDP', 'ICMP', 'ICMPv6EchoRequest', 
-                             'ICMPv6EchoReply', 'ICMPv6DestUnreach', 'Raw', 'Dot1Q', 'GRE', 'MPLS']:
-                return [self._parse_single_layer_packet(node)]
-        
-        # 3. Array subscript: fragment()[0]
-        if isinstance(node, ast.Subscript):
-            return self._handle_subscript(node)
+            # 3. Array subscript: fragment()[0]
+            case ast.Subscript():
+                return self._handle_subscript(node)
         
         if self.verbose:
             print(f"Warning: Unhandled packet node type: {type(node).__name__}")
@@ -222,10 +448,14 @@ class ScapyASTParser(ast.NodeVisitor):
         """Parse a chain of layers: Ether()/IP()/TCP() or with subscripts"""
         layers = []
 
-        def collect_layers(n: ast.AST):
+        # Walk the Div chain with an explicit stack instead of recursion
+        stack: List[ast.AST] = [node]
+        while stack:
+            n = stack.pop()
             if isinstance(n, ast.BinOp) and isinstance(n.op, ast.Div):
-                collect_layers(n.left)
-                collect_layers(n.right)
+                # Push right first so that layers come out in left-to-right order
+                stack.append(n.right)
+                stack.append(n.left)
             elif isinstance(n, ast.BinOp) and isinstance(n.op, ast.Mult):
                 # Handle string multiplication for payload: "ABC"*100
                 if isinstance(n.left, ast.Constant) and isinstance(n.right, ast.Constant):
@@ -283,7 +513,6 @@ class ScapyASTParser(ast.NodeVisitor):
                     )
                     layers.append(raw_layer)
 
-        collect_layers(node)
         return PacketDefinition(layers)
     
     def _parse_single_layer_packet(self, node: ast.Call) -> PacketDefinition:
@@ -328,14 +557,14 @@ class ScapyASTParser(ast.NodeVisitor):
             else:
                 value = self._eval_node(keyword.value)
                 # Check for CIDR notation in IP addresses
-                if isinstance(value, str) and '/' in value and (key in ['src', 'dst']):
+                if key in _ADDR_KEYS and isinstance(value, str) and '/' in value:
                     # This is CIDR notation: Scapy generates packets for all IPs in subnet
                     special_handling[key] = {
                         "type": "cidr_expansion",
                         "cidr": value
                     }
                     # Strip CIDR suffix and keep only the base IP for the layer params
-                    params[key] = value.split('/')[0]
+                    params[key] = value.partition('/')[0]
                 else:
                     params[key] = value
         
@@ -353,9 +582,11 @@ class ScapyASTParser(ast.NodeVisitor):
                     }
             elif isinstance(value, str):
                 # Direct string payload
-                params[f"_arg{i}"] = value
+                # Interned: dynamically built keys repeat across all layers
+                params[sys.intern(f"_arg{i}")] = value
         
-        layer = PacketLayer(layer_type, params)
+        # Layer names come from a small set, intern them for identity compares
+        layer = PacketLayer(sys.intern(layer_type), params)
         
         # If we have special handling, include it in the packet definition
         if special_handling:
@@ -384,7 +615,7 @@ class ScapyASTParser(ast.NodeVisitor):
         # Extract fragSize parameter
         frag_size = None
         for keyword in node.keywords:
-            if keyword.arg in ['fragSize', 'fragsize']:
+            if keyword.arg in _FRAGSIZE_KWS:
                 frag_size = self._eval_node(keyword.value)
         
         # Mark packet with fragmentation special handling
@@ -432,65 +663,92 @@ class ScapyASTParser(ast.NodeVisitor):
         else:
             func_name = node_or_name
 
-        helper_func = self.helper_functions.get(func_name)
-
-        if not helper_func:
-            return []
+        packets = self._helper_cache.get(func_name)
+        if packets is None:
+            packets = self._expand_helper_function(func_name)
+            self._helper_cache[func_name] = packets
 
+        # Callers mutate special_handling (fragmentation, subscripts), so hand
+        # out fresh definitions; layers are never modified and can be shared
+        return [
+            PacketDefinition(
+                list(pkt.layers),
+                dict(pkt.special_handling) if pkt.special_handling else pkt.special_handling
+            )
+            for pkt in packets
+        ]
+    
+    def _expand_helper_function(self, func_name: Optional[str]) -> List[PacketDefinition]:
+        """Extract packet definitions from the return statement of a helper function"""
         # For helper functions without parameters, just evaluate the return statement
         # This handles functions like ipv4_packet1() that return Ether()/IP()/TCP()
-
-        for stmt in helper_func.body:
-            if isinstance(stmt, ast.Return) and stmt.value:
-                return self._extract_packet(stmt.value)
-
-        return []
+        return_value = self._helper_returns.get(func_name)
+        if return_value is None:
+            return []
+        return self._extract_packet(return_value)
     
     def _get_call_name(self, node: ast.Call) -> Optional[str]:
         """Get the function name from a call node"""
-        if isinstance(node.func, ast.Name):
-            return node.func.id
-        elif isinstance(node.func, ast.Attribute):
-            return node.func.attr
-        return None
+        match node.func:
+            case ast.Name(id=name):
+                return name
+            case ast.Attribute(attr=attr):
+                return attr
+            case _:
+                return None
     
     def _eval_node(self, node: ast.AST) -> Any:
         """Safely evaluate an AST node to get its value"""
-        try:
-            value = ast.literal_eval(node)
+        # Fast paths for plain constants and flat collections of them, which
+        # make up most evaluated nodes
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, (ast.Tuple, ast.List)) and all(isinstance(e, ast.Constant) for e in node.elts):
+            values = [e.value for e in node.elts]
+            return tuple(values) if isinstance(node, ast.Tuple) else values
+        
+        # literal_eval results depend only on the node itself, so cache them
+        # (including failures) for nodes evaluated from multiple sites
+        key = id(node)
+        if key in self._eval_cache:
+            value = self._eval_cache[key]
+        else:
+            try:
+                value = ast.literal_eval(node)
+            except (ValueError, TypeError):
+                value = _NOT_LITERAL
+            self._eval_cache[key] = value
+        if value is not _NOT_LITERAL:
             # Handle CIDR notation - keep full CIDR string for special processing
             # Scapy generates packets for all IPs in the subnet when CIDR is used
             return value
-        except (ValueError, TypeError):
-            # Handle more complex expressions
-            if isinstance(node, ast.Name):
+        
+        # Handle more complex expressions
+        match node:
+            case ast.Name(id=name):
                 # Try to resolve variable
-                if node.id in self.variables:
-                    return self._eval_node(self.variables[node.id])
+                if name in self.variables:
+                    return self._eval_node(self.variables[name])
                 # Return variable name as placeholder
-                return f"VAR_{node.id}"
-            elif isinstance(node, ast.BinOp):
-                if isinstance(node.op, ast.Mult):
-                    left = self._eval_node(node.left)
-                    right = self._eval_node(node.right)
-                    if isinstance(left, str) and isinstance(right, int):
-                        return left * right
-                elif isinstance(node.op, ast.Div):
-                    # Handle CIDR notation like "90.90.90.0/30"
-                    # Return just the base address without /mask
-                    left = self._eval_node(node.left)
-                    return left
-            elif isinstance(node, ast.Call):
+                return f"VAR_{name}"
+            case ast.BinOp(op=ast.Mult(), left=left_node, right=right_node):
+                left = self._eval_node(left_node)
+                right = self._eval_node(right_node)
+                if isinstance(left, str) and isinstance(right, int):
+                    return left * right
+            case ast.BinOp(op=ast.Div(), left=left_node):
+                # Handle CIDR notation like "90.90.90.0/30"
+                # Return just the base address without /mask
+                return self._eval_node(left_node)
+            case ast.Call():
                 # Function call - return a placeholder
                 func_name = self._get_call_name(node)
                 return f"CALL_{func_name}"
-            
-            # Return a string representation as fallback
-            result = ast.unparse(node) if hasattr(ast, 'unparse') else str(node)
-            # Strip CIDR from result too
-            if isinstance(result, str) and '/' in result:
-                result = result.split('/')[0]
-            return result
+        
+        # Return a string representation as fallback
+        result = ast.unparse(node) if hasattr(ast, 'unparse') else str(node)
+        # Strip CIDR from result too
+        return result.partition('/')[0]
     
     def _build_pcap_pairs(self) -> List[PCAPPair]:
         """Build PCAP pairs from write_pcap calls"""
@@ -501,12 +759,21 @@ class ScapyASTParser(ast.NodeVisitor):
             filename = call["filename"]
             packets = call["packets"]
             
-            # Determine if this is a send or expect file
-            is_send = "send" in filename.lower() or (not "expect" in filename.lower() and filename != "expect.pcap")
-            is_expect = "expect" in filename.lower() or filename == "expect.pcap"
+            # Determine if this is a send or expect file; anything that is not
+            # an expect file is treated as send
+            lower = filename.lower()
+            is_expect = "expect" in lower
+            is_send = "send" in lower or not is_expect
             
             # Extract base name for pairing
-            base_name = self._get_base_name(filename)
+            stem = filename.replace(".pcap", "")
+            match = _PAIR_SUFFIX_RE.match(stem)
+            if match:
+                base_name = match.group(1)
+            elif stem in ("send", "expect"):
+                base_name = "default"
+            else:
+                base_name = stem
             
             if base_name not in pcap_files:
                 pcap_files[base_name] = {
@@ -535,42 +802,36 @@ class ScapyASTParser(ast.NodeVisitor):
             pairs.append(pair)
         
         return pairs
-    
-    def _get_base_name(self, filename: str) -> str:
-        """Extract base name from PCAP filename for pairing"""
-        filename = filename.replace(".pcap", "")
-        
-        if filename.endswith("-send"):
-            return filename[:-5]
-        elif filename.endswith("-expect"):
-            return filename[:-7]
-        elif filename.endswith("_send"):
-            return filename[:-5]
-        elif filename.endswith("_expect"):
-            return filename[:-7]
-        elif filename == "send":
-            return "default"
-        elif filename == "expect":
-            return "default"
-        else:
-            return filename
+
+
+def _parse_one(filepath: str, verbose: bool, cache_dir: Optional[str]) -> Dict:
+    """Parse a single gen.py file in a worker process"""
+    return ScapyASTParser(verbose=verbose, cache_dir=cache_dir).parse_file(filepath)
 
 
 def main():
     """Command-line interface"""
-    if len(sys.argv) < 2:
-        print("Usage: scapy_ast_parser.py <gen.py file> [--verbose]")
+    files = [arg for arg in sys.argv[1:] if not arg.startswith('-')]
+    if not files:
+        print("Usage: scapy_ast_parser.py <gen.py file>... [--verbose]")
+        print(f"Set {_CACHE_DIR_ENV} to a directory to cache the produced IR")
         sys.exit(1)
     
-    filepath = sys.argv[1]
     verbose = "--verbose" in sys.argv or "-v" in sys.argv
+    cache_dir = os.environ.get(_CACHE_DIR_ENV) or None
     
-    parser = ScapyASTParser(verbose=verbose)
-    ir = parser.parse_file(filepath)
+    if len(files) == 1:
+        parser = ScapyASTParser(verbose=verbose, cache_dir=cache_dir)
+        sys.stdout.buffer.write(parser.parse_file_json(files[0]))
+        return
+    
+    # Files are independent, parse them in parallel and key the IR by path
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(_parse_one, files, repeat(verbose), repeat(cache_dir))
+        ir = dict(zip(files, results))
     
     # Output JSON
-    print(json.dumps(ir, indent=2))
-
+    sys.stdout.buffer.write(_encode_ir(ir))
 
 if __name__ == "__main__":
     main()